@@ -0,0 +1,192 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_SHINGLE_BASE = np.uint64(257)
+
+
+@dataclass
+class DeduplicationReport:
+    """Summary of the chunks removed by :class:`NearDuplicateFilter`."""
+
+    total_chunks: int
+    kept_chunks: int
+    total_characters: int
+    removed_characters: int
+    duplicate_of: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def removed_chunks(self) -> int:
+        return self.total_chunks - self.kept_chunks
+
+    @property
+    def removed_ratio(self) -> float:
+        """Fraction of chunks that were dropped."""
+
+        if self.total_chunks == 0:
+            return 0.0
+        return self.removed_chunks / self.total_chunks
+
+    def summary(self) -> str:
+        return (
+            f"removed {self.removed_chunks} of {self.total_chunks} chunks "
+            f"({self.removed_ratio:.1%}, {self.removed_characters} characters) "
+            "as near-duplicates"
+        )
+
+
+class NearDuplicateFilter:
+    """Drop near-duplicate text chunks using MinHash signatures and LSH banding.
+
+    Each chunk is normalised (lower-cased, whitespace collapsed) and broken
+    into overlapping byte shingles. ``num_perm`` MinHash values estimate the
+    Jaccard similarity between shingle sets, and the signature is split into
+    bands so that only chunks sharing at least one identical band are
+    compared. A chunk is dropped when its estimated similarity to an earlier
+    kept chunk reaches ``threshold``; the first occurrence always survives.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 9,
+        bands: Optional[int] = None,
+        seed: int = 1,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in the interval (0, 1]")
+        if shingle_size <= 0:
+            raise ValueError("shingle_size must be a positive integer")
+        if bands is not None and (bands <= 0 or num_perm % bands != 0):
+            raise ValueError("bands must be a positive divisor of num_perm")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands = bands or self._optimal_bands(threshold, num_perm)
+        self.rows = num_perm // self.bands
+
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def filter(self, texts: Sequence[str]) -> Tuple[List[str], DeduplicationReport]:
+        """Return the texts that survive deduplication and a report."""
+
+        kept, report = self.filter_indices(texts)
+        return [texts[index] for index in kept], report
+
+    def filter_indices(
+        self, texts: Sequence[str]
+    ) -> Tuple[List[int], DeduplicationReport]:
+        """Return the indices of the texts to keep and a report."""
+
+        kept: List[int] = []
+        duplicate_of: Dict[int, int] = {}
+        buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        signatures = self.signatures(texts)
+
+        for index, signature in enumerate(signatures):
+            keys = [
+                signature[band * self.rows : (band + 1) * self.rows].tobytes()
+                for band in range(self.bands)
+            ]
+            match = self._find_match(signature, keys, buckets, signatures)
+            if match is not None:
+                duplicate_of[index] = match
+                continue
+
+            kept.append(index)
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(index)
+
+        report = DeduplicationReport(
+            total_chunks=len(texts),
+            kept_chunks=len(kept),
+            total_characters=sum(len(text) for text in texts),
+            removed_characters=sum(len(texts[index]) for index in duplicate_of),
+            duplicate_of=duplicate_of,
+        )
+        return kept, report
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """Return the ``(len(texts), num_perm)`` MinHash signature matrix."""
+
+        matrix = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for row, text in enumerate(texts):
+            shingles = self._shingle_hashes(text)
+            hashed = (
+                self._a[:, None] * shingles[None, :] + self._b[:, None]
+            ) % _MERSENNE_PRIME
+            matrix[row] = hashed.min(axis=1)
+        return matrix
+
+    def _find_match(
+        self,
+        signature: np.ndarray,
+        keys: List[bytes],
+        buckets: List[Dict[bytes, List[int]]],
+        signatures: np.ndarray,
+    ) -> Optional[int]:
+        candidates = sorted(
+            {index for band, key in enumerate(keys) for index in buckets[band].get(key, ())}
+        )
+        for candidate in candidates:
+            similarity = np.count_nonzero(signatures[candidate] == signature)
+            if similarity / self.num_perm >= self.threshold:
+                return candidate
+        return None
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        normalised = " ".join(text.lower().split()).encode("utf-8")
+        data = np.frombuffer(normalised, dtype=np.uint8).astype(np.uint64)
+        if data.size < self.shingle_size:
+            data = np.pad(data, (0, self.shingle_size - data.size))
+
+        count = data.size - self.shingle_size + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            hashes = (hashes * _SHINGLE_BASE + data[offset : offset + count]) % (
+                _MERSENNE_PRIME
+            )
+        return np.unique(hashes)
+
+    @staticmethod
+    def _optimal_bands(threshold: float, num_perm: int) -> int:
+        # The LSH S-curve is steepest near (1 / bands) ** (1 / rows); pick the
+        # split whose inflection point lies closest to the requested threshold.
+        divisors = [bands for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+        return min(
+            divisors,
+            key=lambda bands: abs(
+                (1.0 / bands) ** (bands / num_perm) - threshold
+            ),
+        )
+
+
+if __name__ == "__main__":
+    footer = (
+        "Confidential - Annual Report 2023. This document is intended solely for "
+        "shareholders of Example Corp and may not be reproduced or distributed "
+        "without prior written consent. Page {page} of 48."
+    )
+    chunks = [
+        footer.format(page=1),
+        "Revenue grew by 12% driven by cloud services and new enterprise contracts.",
+        footer.format(page=2),
+        "Operating expenses were flat compared with the previous fiscal year.",
+        "Operating expenses were flat compared with the previous fiscal year.",
+        "Headcount increased to 1,200 employees across four offices.",
+    ]
+
+    # The page 2 footer differs from the page 1 footer only by its page number
+    # and is dropped as a near-duplicate; the repeated expenses line is an
+    # exact duplicate and is dropped too.
+    deduplicator = NearDuplicateFilter(threshold=0.8)
+    unique_chunks, report = deduplicator.filter(chunks)
+    print(report.summary())
+    print(report.duplicate_of)
+    print(unique_chunks)
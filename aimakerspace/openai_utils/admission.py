@@ -0,0 +1,278 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+class AdmissionRejected(Exception):
+    """Raised when the limiter is saturated and the caller should back off."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Too many outbound requests in flight; retry after {retry_after:g}s"
+        )
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A queued caller that is woken up when a slot is handed to it."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future: Optional[asyncio.Future] = (
+            loop.create_future() if loop is not None else None
+        )
+
+    def grant(self) -> bool:
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # The waiter's event loop has been closed; nobody is listening.
+            return False
+        return True
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """Bound the number of concurrent outbound API calls.
+
+    Up to ``max_concurrency`` callers run at once and up to ``max_queue``
+    more wait in FIFO order. When the queue is full, or a queued caller has
+    waited ``queue_timeout`` seconds, :class:`AdmissionRejected` is raised
+    immediately instead of piling more requests onto the provider. The
+    limiter is thread-safe and can be shared by sync and async callers on
+    any event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        retry_after: float = 1.0,
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyLimiter":
+        """Build a limiter configured by ``OPENAI_MAX_CONCURRENCY`` and friends."""
+
+        return cls(
+            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv("OPENAI_MAX_QUEUE", "32")),
+            queue_timeout=float(os.getenv("OPENAI_QUEUE_TIMEOUT", "10")),
+            retry_after=float(os.getenv("OPENAI_RETRY_AFTER", "1")),
+        )
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def acquire(self) -> None:
+        """Block until a slot is free or raise :class:`AdmissionRejected`."""
+
+        waiter = self._enqueue(None)
+        if waiter is None:
+            return
+        if not waiter.event.wait(self.queue_timeout):
+            self._abandon(waiter)
+
+    async def aacquire(self) -> None:
+        """Await a free slot or raise :class:`AdmissionRejected`."""
+
+        waiter = self._enqueue(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+        except asyncio.CancelledError:
+            if not self._withdraw(waiter):
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Return a slot, handing it straight to the oldest queued caller."""
+
+        with self._lock:
+            while self._waiters:
+                if self._waiters.popleft().grant():
+                    return
+            self._active -= 1
+
+    @contextmanager
+    def limit(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def alimit(self) -> AsyncIterator[None]:
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _enqueue(self, loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_Waiter]:
+        with self._lock:
+            if self._active < self.max_concurrency and not self._waiters:
+                self._active += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                raise AdmissionRejected(self.retry_after)
+
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        # A slot granted just as the wait timed out is kept and used.
+        if self._withdraw(waiter):
+            raise AdmissionRejected(self.retry_after)
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Remove ``waiter`` from the queue; ``False`` if it was already granted."""
+
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                return False
+            return True
+
+
+class SingleFlight:
+    """Coalesce identical in-flight calls into a single upstream request.
+
+    The first caller for a key runs the call; every caller that arrives
+    with the same key while it is running receives the same result (or
+    exception) without issuing a request of its own. Entries are dropped as
+    soon as the call finishes, so nothing is cached beyond its lifetime.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """Run ``function`` for ``key`` unless an identical call is running."""
+
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def ado(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of :meth:`do` for coroutine functions.
+
+        The upstream call runs in its own task, so cancelling any caller,
+        including the one that started it, only abandons that caller's wait.
+        """
+
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(function())
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle(self, key: Hashable, future: Future, task: "asyncio.Task[Any]") -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, result=task.result())
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(
+        self,
+        key: Hashable,
+        future: Future,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+_default_limiter: Optional[ConcurrencyLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def default_limiter() -> ConcurrencyLimiter:
+    """Return the process-wide limiter shared by all OpenAI wrappers."""
+
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = ConcurrencyLimiter.from_env()
+        return _default_limiter
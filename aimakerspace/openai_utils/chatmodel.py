@@ -1,16 +1,27 @@
 import os
-from typing import Any, AsyncIterator, Iterable, List, MutableMapping
+from typing import Any, AsyncIterator, Iterable, List, MutableMapping, Optional
 
 from openai import AsyncOpenAI, OpenAI
 
+from aimakerspace.openai_utils.admission import ConcurrencyLimiter, default_limiter
+
 ChatMessage = MutableMapping[str, Any]
 
 
 class ChatOpenAI:
-    """Thin wrapper around the OpenAI chat completion APIs."""
+    """Thin wrapper around the OpenAI chat completion APIs.
+
+    Requests pass through a shared :class:`ConcurrencyLimiter`; a streaming
+    request holds its slot until the stream has been fully consumed.
+    """
 
-    def __init__(self, model_name: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        limiter: Optional[ConcurrencyLimiter] = None,
+    ):
         self.model_name = model_name
+        self.limiter = limiter or default_limiter()
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key is None:
             raise ValueError("OPENAI_API_KEY is not set")
@@ -33,9 +44,10 @@ class ChatOpenAI:
         """
 
         message_list = self._coerce_messages(messages)
-        response = self._client.chat.completions.create(
-            model=self.model_name, messages=message_list, **kwargs
-        )
+        with self.limiter.limit():
+            response = self._client.chat.completions.create(
+                model=self.model_name, messages=message_list, **kwargs
+            )
 
         if text_only:
             return response.choices[0].message.content
@@ -48,14 +60,15 @@ class ChatOpenAI:
         """Yield streaming completion chunks as they arrive from the API."""
 
         message_list = self._coerce_messages(messages)
-        stream = await self._async_client.chat.completions.create(
-            model=self.model_name, messages=message_list, stream=True, **kwargs
-        )
-
-        async for chunk in stream:
-            content = chunk.choices[0].delta.content
-            if content is not None:
-                yield content
+        async with self.limiter.alimit():
+            stream = await self._async_client.chat.completions.create(
+                model=self.model_name, messages=message_list, stream=True, **kwargs
+            )
+
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content
+                if content is not None:
+                    yield content
 
     def _coerce_messages(self, messages: Iterable[ChatMessage]) -> List[ChatMessage]:
         if isinstance(messages, list):
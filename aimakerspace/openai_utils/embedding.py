@@ -1,14 +1,32 @@
 import asyncio
 import os
-from typing import Iterable, List
+from typing import Hashable, Iterable, List, Optional, Union
 
 from openai import AsyncOpenAI, OpenAI
 
+from aimakerspace.openai_utils.admission import (
+    ConcurrencyLimiter,
+    SingleFlight,
+    default_limiter,
+)
+
+# Shared by every EmbeddingModel so identical concurrent requests coalesce
+# across instances, not just within one.
+_singleflight = SingleFlight()
+
 
 class EmbeddingModel:
-    """Helper for generating embeddings via the OpenAI API."""
+    """Helper for generating embeddings via the OpenAI API.
+
+    Every request passes through a shared :class:`ConcurrencyLimiter`, and
+    identical requests already in flight are coalesced into one API call.
+    """
 
-    def __init__(self, embeddings_model_name: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        embeddings_model_name: str = "text-embedding-3-small",
+        limiter: Optional[ConcurrencyLimiter] = None,
+    ):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key is None:
             raise ValueError(
@@ -17,44 +35,68 @@ class EmbeddingModel:
             )
 
         self.embeddings_model_name = embeddings_model_name
+        self.limiter = limiter or default_limiter()
         self.async_client = AsyncOpenAI()
         self.client = OpenAI()
 
     async def async_get_embeddings(self, list_of_text: Iterable[str]) -> List[List[float]]:
         """Return embeddings for ``list_of_text`` using the async client."""
 
-        embedding_response = await self.async_client.embeddings.create(
-            input=list(list_of_text), model=self.embeddings_model_name
-        )
+        texts = list(list_of_text)
+
+        async def request() -> List[List[float]]:
+            async with self.limiter.alimit():
+                embedding_response = await self.async_client.embeddings.create(
+                    input=texts, model=self.embeddings_model_name
+                )
+            return [item.embedding for item in embedding_response.data]
 
-        return [item.embedding for item in embedding_response.data]
+        return await _singleflight.ado(self._key(texts), request)
 
     async def async_get_embedding(self, text: str) -> List[float]:
         """Return an embedding for a single text using the async client."""
 
-        embedding = await self.async_client.embeddings.create(
-            input=text, model=self.embeddings_model_name
-        )
+        async def request() -> List[float]:
+            async with self.limiter.alimit():
+                embedding = await self.async_client.embeddings.create(
+                    input=text, model=self.embeddings_model_name
+                )
+            return embedding.data[0].embedding
 
-        return embedding.data[0].embedding
+        return await _singleflight.ado(self._key(text), request)
 
     def get_embeddings(self, list_of_text: Iterable[str]) -> List[List[float]]:
         """Return embeddings for ``list_of_text`` using the sync client."""
 
-        embedding_response = self.client.embeddings.create(
-            input=list(list_of_text), model=self.embeddings_model_name
-        )
+        texts = list(list_of_text)
+
+        def request() -> List[List[float]]:
+            with self.limiter.limit():
+                embedding_response = self.client.embeddings.create(
+                    input=texts, model=self.embeddings_model_name
+                )
+            return [item.embedding for item in embedding_response.data]
 
-        return [item.embedding for item in embedding_response.data]
+        return _singleflight.do(self._key(texts), request)
 
     def get_embedding(self, text: str) -> List[float]:
         """Return an embedding for a single text using the sync client."""
 
-        embedding = self.client.embeddings.create(
-            input=text, model=self.embeddings_model_name
-        )
-
-        return embedding.data[0].embedding
+        def request() -> List[float]:
+            with self.limiter.limit():
+                embedding = self.client.embeddings.create(
+                    input=text, model=self.embeddings_model_name
+                )
+            return embedding.data[0].embedding
+
+        return _singleflight.do(self._key(text), request)
+
+    def _key(self, payload: Union[str, List[str]]) -> Hashable:
+        if isinstance(payload, list):
+            payload = tuple(payload)
+        # The API key is part of the key so callers never share results
+        # fetched with someone else's credentials.
+        return (self.openai_api_key, self.embeddings_model_name, payload)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from aimakerspace.vectordatabase import VectorDatabase
+
+if TYPE_CHECKING:
+    from aimakerspace.openai_utils.embedding import EmbeddingModel
+
+_COLUMNS = (
+    "vectors",
+    "norms",
+    "document_codes",
+    "pages",
+    "start_offsets",
+    "end_offsets",
+)
+_CURRENT_FILE = "CURRENT"
+_LOCK_FILE = ".lock"
+_EXCERPT_FILE = "excerpt.txt"
+
+
+class MappedTexts(Sequence[str]):
+    """Chunk texts decoded on demand from a memory-mapped UTF-8 buffer."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("text index out of range")
+
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._data[start:end].tobytes().decode("utf-8")
+
+
+class SharedVectorIndex:
+    """Publish a :class:`VectorDatabase` to disk and attach to it via mmap.
+
+    A single writer calls :meth:`publish` to store every column of the
+    database as ``.npy`` files inside a new generation directory, then
+    atomically swaps the ``CURRENT`` pointer to it. Any number of reader
+    processes call :meth:`attach`, which memory-maps the current generation
+    read-only, so the operating system shares the pages between processes
+    instead of every worker holding its own copy. Readers re-check the
+    generation counter on each call and switch to a newer index as soon as
+    it has been published.
+    """
+
+    def __init__(self, directory: str, keep_generations: int = 2):
+        if keep_generations < 1:
+            raise ValueError("keep_generations must be at least 1")
+
+        self.directory = Path(directory)
+        self.keep_generations = keep_generations
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._attached: Optional[Tuple[int, VectorDatabase]] = None
+
+    def generation(self) -> int:
+        """Return the currently published generation, or ``0`` if none."""
+
+        try:
+            return int((self.directory / _CURRENT_FILE).read_text().strip())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def publish(self, database: VectorDatabase, excerpt: str = "") -> int:
+        """Write ``database`` as a new generation and return its number.
+
+        ``excerpt`` is stored verbatim alongside the index and returned by
+        :meth:`excerpt`, e.g. the start of the source document, which cannot
+        be rebuilt from chunks once some of them have been dropped.
+        """
+
+        with self._writer_lock():
+            # Number from the directories on disk as well as CURRENT, so a
+            # generation left behind by a writer that crashed before updating
+            # the pointer is never reused.
+            generation = max(self.generation(), *self._generations_on_disk(), 0) + 1
+            target = self._generation_path(generation)
+            staging = target.with_name(target.name + ".tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir()
+
+            for name, array in database.to_columns().items():
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+
+            encoded = [text.encode("utf-8") for text in database.texts]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+            np.save(staging / "text_offsets.npy", offsets)
+            np.save(
+                staging / "text_data.npy",
+                np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            )
+            (staging / "documents.json").write_text(
+                json.dumps(database.document_ids)
+            )
+            (staging / _EXCERPT_FILE).write_text(excerpt, encoding="utf-8")
+
+            os.replace(staging, target)
+            self._write_current(generation)
+            self._prune(generation)
+            return generation
+
+    def attach(
+        self, embedding_model: Optional["EmbeddingModel"] = None
+    ) -> Optional[VectorDatabase]:
+        """Return a read-only database for the latest generation.
+
+        The database is cached until a newer generation is published. Returns
+        ``None`` when nothing has been published yet.
+        """
+
+        while True:
+            generation = self.generation()
+            if generation == 0:
+                return None
+            if self._attached is not None and self._attached[0] == generation:
+                return self._attached[1]
+
+            try:
+                database = self._open(generation, embedding_model)
+            except FileNotFoundError:
+                # The writer pruned this generation between reading the
+                # pointer and opening the files; a newer one is available.
+                continue
+
+            self._attached = (generation, database)
+            return database
+
+    def excerpt(self) -> str:
+        """Return the excerpt published with the latest generation, or ``""``."""
+
+        while True:
+            generation = self.generation()
+            if generation == 0:
+                return ""
+            try:
+                return (self._generation_path(generation) / _EXCERPT_FILE).read_text(
+                    encoding="utf-8"
+                )
+            except FileNotFoundError:
+                if self.generation() == generation:
+                    return ""
+                # Pruned by a newer publish; read that generation instead.
+
+    def _open(
+        self, generation: int, embedding_model: Optional["EmbeddingModel"]
+    ) -> VectorDatabase:
+        path = self._generation_path(generation)
+        columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r") for name in _COLUMNS
+        }
+        texts = MappedTexts(
+            np.load(path / "text_data.npy", mmap_mode="r"),
+            np.load(path / "text_offsets.npy", mmap_mode="r"),
+        )
+        document_ids = json.loads((path / "documents.json").read_text())
+
+        return VectorDatabase.from_columns(
+            columns, texts, document_ids, embedding_model
+        )
+
+    def _generation_path(self, generation: int) -> Path:
+        return self.directory / f"gen-{generation:08d}"
+
+    def _write_current(self, generation: int) -> None:
+        pointer = self.directory / (_CURRENT_FILE + ".tmp")
+        pointer.write_text(str(generation))
+        os.replace(pointer, self.directory / _CURRENT_FILE)
+
+    def _generations_on_disk(self) -> List[int]:
+        generations = []
+        for entry in self.directory.glob("gen-*"):
+            suffix = entry.name[len("gen-") :]
+            if suffix.isdigit():
+                generations.append(int(suffix))
+        return generations
+
+    def _prune(self, generation: int) -> None:
+        # Readers still holding an older mapping keep working after the files
+        # are unlinked; they only lose the ability to open them again.
+        oldest_kept = generation - self.keep_generations + 1
+        for old_generation in self._generations_on_disk():
+            if old_generation < oldest_kept:
+                shutil.rmtree(self._generation_path(old_generation), ignore_errors=True)
+
+    @contextmanager
+    def _writer_lock(self) -> Iterator[None]:
+        import fcntl
+
+        with open(self.directory / _LOCK_FILE, "w") as lock_handle:
+            fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_handle, fcntl.LOCK_UN)
@@ -1,9 +1,26 @@
 import asyncio
-from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
-from aimakerspace.openai_utils.embedding import EmbeddingModel
+if TYPE_CHECKING:
+    from aimakerspace.openai_utils.embedding import EmbeddingModel
+
+ChunkMetadata = Mapping[str, Any]
+
+_INITIAL_CAPACITY = 64
 
 
 def cosine_similarity(vector_a: np.ndarray, vector_b: np.ndarray) -> float:
@@ -19,35 +36,226 @@ def cosine_similarity(vector_a: np.ndarray, vector_b: np.ndarray) -> float:
 
 
 class VectorDatabase:
-    """Minimal in-memory vector store backed by numpy arrays."""
+    """Minimal in-memory vector store backed by columnar numpy arrays.
 
-    def __init__(self, embedding_model: Optional[EmbeddingModel] = None):
-        self.vectors: Dict[str, np.ndarray] = {}
-        self.embedding_model = embedding_model or EmbeddingModel()
+    Every inserted chunk receives an integer ID equal to its row in the
+    underlying arrays. Chunk metadata (document, page and character offsets)
+    lives in parallel integer columns so that filters can be evaluated as
+    boolean masks before any similarity scores are computed. Chunk text is
+    kept in a separate list and is only touched when results are returned.
+    """
 
-    def insert(self, key: str, vector: Iterable[float]) -> None:
-        """Store ``vector`` so that it can be retrieved with ``key`` later on."""
+    def __init__(self, embedding_model: Optional["EmbeddingModel"] = None):
+        self._embedding_model = embedding_model
 
-        self.vectors[key] = np.asarray(vector, dtype=float)
+        self._size = 0
+        self._capacity = 0
+        self._dimension: Optional[int] = None
+        self._vectors = np.empty((0, 0), dtype=float)
+        self._norms = np.empty(0, dtype=float)
+        self._document_codes = np.empty(0, dtype=np.int32)
+        self._pages = np.empty(0, dtype=np.int32)
+        self._start_offsets = np.empty(0, dtype=np.int64)
+        self._end_offsets = np.empty(0, dtype=np.int64)
 
-    def search(
+        self._texts: Sequence[str] = []
+        self._document_ids: List[str] = []
+        self._document_lookup: Dict[str, int] = {}
+        self._frozen = False
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Mapping[str, np.ndarray],
+        texts: Sequence[str],
+        document_ids: Sequence[str],
+        embedding_model: Optional["EmbeddingModel"] = None,
+    ) -> "VectorDatabase":
+        """Wrap existing column arrays without copying them.
+
+        ``columns`` must provide the arrays returned by :meth:`to_columns`.
+        The resulting database is read-only: the arrays may be memory-mapped
+        or shared with other processes, so :meth:`insert` raises.
+        """
+
+        database = cls(embedding_model)
+        vectors = columns["vectors"]
+        database._size = database._capacity = vectors.shape[0]
+        database._dimension = vectors.shape[1] if vectors.ndim == 2 else None
+        for name, array in columns.items():
+            setattr(database, f"_{name}", array)
+        database._texts = texts
+        database._document_ids = list(document_ids)
+        database._document_lookup = {
+            document_id: code for code, document_id in enumerate(document_ids)
+        }
+        database._frozen = True
+        return database
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Return the column arrays trimmed to the stored chunks."""
+
+        return {
+            "vectors": self.vectors,
+            "norms": self._readonly(self._norms[: self._size]),
+            "document_codes": self._readonly(self._document_codes[: self._size]),
+            "pages": self.pages,
+            "start_offsets": self.start_offsets,
+            "end_offsets": self.end_offsets,
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def embedding_model(self) -> "EmbeddingModel":
+        """Embedding model used for text queries, created on first use."""
+
+        if self._embedding_model is None:
+            # Imported lazily so that loading a persisted index does not pull
+            # in the openai SDK until a text query actually needs it.
+            from aimakerspace.openai_utils.embedding import EmbeddingModel
+
+            self._embedding_model = EmbeddingModel()
+        return self._embedding_model
+
+    @embedding_model.setter
+    def embedding_model(self, embedding_model: "EmbeddingModel") -> None:
+        self._embedding_model = embedding_model
+
+    @property
+    def texts(self) -> Sequence[str]:
+        """Chunk texts indexed by chunk ID."""
+
+        return self._texts
+
+    @property
+    def document_ids(self) -> List[str]:
+        """Document IDs indexed by the codes stored in the document column."""
+
+        return list(self._document_ids)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Integer IDs of every stored chunk."""
+
+        return np.arange(self._size, dtype=np.int64)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only view of the ``(n_chunks, dimension)`` vector matrix."""
+
+        return self._readonly(self._vectors[: self._size])
+
+    @property
+    def pages(self) -> np.ndarray:
+        return self._readonly(self._pages[: self._size])
+
+    @property
+    def start_offsets(self) -> np.ndarray:
+        return self._readonly(self._start_offsets[: self._size])
+
+    @property
+    def end_offsets(self) -> np.ndarray:
+        return self._readonly(self._end_offsets[: self._size])
+
+    def insert(
+        self,
+        key: str,
+        vector: Iterable[float],
+        document_id: str = "",
+        page: int = -1,
+        start: int = -1,
+        end: int = -1,
+    ) -> int:
+        """Store ``vector`` for the chunk text ``key`` and return its chunk ID.
+
+        Identical texts are stored as separate chunks, so the same passage
+        appearing in two documents (or twice in one) keeps both records.
+        ``page``, ``start`` and ``end`` default to ``-1`` when unknown.
+        """
+
+        if self._frozen:
+            raise RuntimeError("Cannot insert into a read-only VectorDatabase")
+
+        array = np.asarray(vector, dtype=float).ravel()
+        if self._dimension is None:
+            self._dimension = array.shape[0]
+        elif array.shape[0] != self._dimension:
+            raise ValueError(
+                f"Vector has dimension {array.shape[0]}, expected {self._dimension}"
+            )
+
+        self._reserve(self._size + 1)
+        row = self._size
+        self._vectors[row] = array
+        self._norms[row] = np.linalg.norm(array)
+        self._document_codes[row] = self._document_code(document_id)
+        self._pages[row] = page
+        self._start_offsets[row] = start
+        self._end_offsets[row] = end
+        self._texts.append(key)
+        self._size += 1
+        return row
+
+    def search_ids(
         self,
         query_vector: Iterable[float],
         k: int,
         distance_measure: Callable[[np.ndarray, np.ndarray], float] = cosine_similarity,
-    ) -> List[Tuple[str, float]]:
-        """Return the ``k`` vectors most similar to ``query_vector``."""
+        document_ids: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return ``(chunk_id, score)`` pairs for the ``k`` best matches.
+
+        ``document_ids`` restricts the search to chunks from those documents
+        and ``page_range`` to chunks whose page lies in the inclusive
+        ``(first, last)`` range. Only rows passing every filter are scored.
+        """
 
         if k <= 0:
             raise ValueError("k must be a positive integer")
 
-        query = np.asarray(query_vector, dtype=float)
-        scores = [
-            (key, distance_measure(query, vector))
-            for key, vector in self.vectors.items()
-        ]
-        scores.sort(key=lambda item: item[1], reverse=True)
-        return scores[:k]
+        candidates = np.flatnonzero(self._filter_mask(document_ids, page_range))
+        if candidates.size == 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=float).ravel()
+        if distance_measure is cosine_similarity:
+            scores = self._cosine_scores(query, candidates)
+        else:
+            scores = np.fromiter(
+                (distance_measure(query, self._vectors[row]) for row in candidates),
+                dtype=float,
+                count=candidates.size,
+            )
+
+        top = min(k, candidates.size)
+        if top < candidates.size:
+            best = np.argpartition(-scores, top - 1)[:top]
+        else:
+            best = np.arange(candidates.size)
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+    def search(
+        self,
+        query_vector: Iterable[float],
+        k: int,
+        distance_measure: Callable[[np.ndarray, np.ndarray], float] = cosine_similarity,
+        document_ids: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return the ``k`` chunk texts most similar to ``query_vector``."""
+
+        results = self.search_ids(
+            query_vector,
+            k,
+            distance_measure,
+            document_ids=document_ids,
+            page_range=page_range,
+        )
+        return [(self._texts[chunk_id], score) for chunk_id, score in results]
 
     def search_by_text(
         self,
@@ -55,28 +263,186 @@ class VectorDatabase:
         k: int,
         distance_measure: Callable[[np.ndarray, np.ndarray], float] = cosine_similarity,
         return_as_text: bool = False,
+        document_ids: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None,
     ) -> Union[List[Tuple[str, float]], List[str]]:
         """Vector search using an embedding generated from ``query_text``."""
 
         query_vector = self.embedding_model.get_embedding(query_text)
-        results = self.search(query_vector, k, distance_measure)
+        results = self.search(
+            query_vector,
+            k,
+            distance_measure,
+            document_ids=document_ids,
+            page_range=page_range,
+        )
+        if return_as_text:
+            return [result[0] for result in results]
+        return results
+
+    async def asearch_by_text(
+        self,
+        query_text: str,
+        k: int,
+        distance_measure: Callable[[np.ndarray, np.ndarray], float] = cosine_similarity,
+        return_as_text: bool = False,
+        document_ids: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None,
+    ) -> Union[List[Tuple[str, float]], List[str]]:
+        """Async variant of :meth:`search_by_text`."""
+
+        query_vector = await self.embedding_model.async_get_embedding(query_text)
+        results = self.search(
+            query_vector,
+            k,
+            distance_measure,
+            document_ids=document_ids,
+            page_range=page_range,
+        )
         if return_as_text:
             return [result[0] for result in results]
         return results
 
-    def retrieve_from_key(self, key: str) -> Optional[np.ndarray]:
-        """Return the stored vector for ``key`` if present."""
+    def retrieve_from_key(self, key: Union[int, str]) -> Optional[np.ndarray]:
+        """Return the stored vector for a chunk ID or chunk text if present.
+
+        When several chunks share the same text the first one is returned.
+        """
+
+        chunk_id = self._resolve_key(key)
+        if chunk_id is None:
+            return None
+        return self._vectors[chunk_id].copy()
+
+    def get_text(self, chunk_id: int) -> str:
+        """Return the text stored for ``chunk_id``."""
+
+        return self._texts[chunk_id]
+
+    def get_metadata(self, chunk_id: int) -> Dict[str, Any]:
+        """Return the metadata record stored for ``chunk_id``."""
+
+        if not 0 <= chunk_id < self._size:
+            raise IndexError(f"Unknown chunk id: {chunk_id}")
+
+        return {
+            "id": chunk_id,
+            "document_id": self._document_ids[self._document_codes[chunk_id]],
+            "page": int(self._pages[chunk_id]),
+            "start": int(self._start_offsets[chunk_id]),
+            "end": int(self._end_offsets[chunk_id]),
+        }
 
-        return self.vectors.get(key)
+    async def abuild_from_list(
+        self,
+        list_of_text: List[str],
+        metadata: Optional[Sequence[ChunkMetadata]] = None,
+    ) -> "VectorDatabase":
+        """Populate the vector store asynchronously from raw text snippets.
+
+        ``metadata`` may supply one mapping per text with any of the
+        ``document_id``, ``page``, ``start`` and ``end`` keys.
+        """
 
-    async def abuild_from_list(self, list_of_text: List[str]) -> "VectorDatabase":
-        """Populate the vector store asynchronously from raw text snippets."""
+        if metadata is not None and len(metadata) != len(list_of_text):
+            raise ValueError("metadata must contain one entry per text")
 
         embeddings = await self.embedding_model.async_get_embeddings(list_of_text)
-        for text, embedding in zip(list_of_text, embeddings):
-            self.insert(text, embedding)
+        for index, (text, embedding) in enumerate(zip(list_of_text, embeddings)):
+            record = metadata[index] if metadata is not None else {}
+            self.insert(text, embedding, **record)
         return self
 
+    def _filter_mask(
+        self,
+        document_ids: Optional[Iterable[str]],
+        page_range: Optional[Tuple[int, int]],
+    ) -> np.ndarray:
+        if isinstance(document_ids, str):
+            # A bare string would be iterated character by character and
+            # silently match nothing.
+            raise TypeError(
+                "document_ids must be an iterable of document IDs, not a string"
+            )
+
+        mask = np.ones(self._size, dtype=bool)
+
+        if document_ids is not None:
+            codes = [
+                self._document_lookup[document_id]
+                for document_id in document_ids
+                if document_id in self._document_lookup
+            ]
+            mask &= np.isin(self._document_codes[: self._size], codes)
+
+        if page_range is not None:
+            first, last = page_range
+            pages = self._pages[: self._size]
+            mask &= (pages >= first) & (pages <= last)
+
+        return mask
+
+    def _cosine_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return np.zeros(rows.size, dtype=float)
+
+        if rows.size == self._size:
+            matrix = self._vectors[: self._size]
+            norms = self._norms[: self._size]
+        else:
+            matrix = self._vectors[rows]
+            norms = self._norms[rows]
+
+        dots = matrix @ query
+        denominators = norms * query_norm
+        return np.divide(
+            dots, denominators, out=np.zeros_like(dots), where=denominators != 0
+        )
+
+    def _resolve_key(self, key: Union[int, str]) -> Optional[int]:
+        if isinstance(key, str):
+            try:
+                return self._texts.index(key)
+            except ValueError:
+                return None
+        if 0 <= key < self._size:
+            return int(key)
+        return None
+
+    def _document_code(self, document_id: str) -> int:
+        code = self._document_lookup.get(document_id)
+        if code is None:
+            code = len(self._document_ids)
+            self._document_ids.append(document_id)
+            self._document_lookup[document_id] = code
+        return code
+
+    def _reserve(self, required: int) -> None:
+        if required <= self._capacity:
+            return
+
+        capacity = max(_INITIAL_CAPACITY, self._capacity * 2, required)
+        self._vectors = self._grow(self._vectors, (capacity, self._dimension))
+        self._norms = self._grow(self._norms, (capacity,))
+        self._document_codes = self._grow(self._document_codes, (capacity,))
+        self._pages = self._grow(self._pages, (capacity,))
+        self._start_offsets = self._grow(self._start_offsets, (capacity,))
+        self._end_offsets = self._grow(self._end_offsets, (capacity,))
+        self._capacity = capacity
+
+    def _grow(self, array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        grown = np.empty(shape, dtype=array.dtype)
+        if self._size:
+            grown[: self._size] = array[: self._size]
+        return grown
+
+    @staticmethod
+    def _readonly(array: np.ndarray) -> np.ndarray:
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
 
 if __name__ == "__main__":
     list_of_text = [
@@ -86,9 +452,16 @@ if __name__ == "__main__":
         "My sister adopted a kitten yesterday.",
         "Look at this cute hamster munching on a piece of broccoli.",
     ]
+    metadata = [
+        {"document_id": "food.txt", "page": 1},
+        {"document_id": "food.txt", "page": 2},
+        {"document_id": "pets.txt", "page": 1},
+        {"document_id": "pets.txt", "page": 2},
+        {"document_id": "pets.txt", "page": 3},
+    ]
 
     vector_db = VectorDatabase()
-    vector_db = asyncio.run(vector_db.abuild_from_list(list_of_text))
+    vector_db = asyncio.run(vector_db.abuild_from_list(list_of_text, metadata))
     k = 2
 
     searched_vector = vector_db.search_by_text("I think fruit is awesome!", k=k)
@@ -103,3 +476,12 @@ if __name__ == "__main__":
         "I think fruit is awesome!", k=k, return_as_text=True
     )
     print(f"Closest {k} text(s):", relevant_texts)
+
+    filtered_texts = vector_db.search_by_text(
+        "I think fruit is awesome!",
+        k=k,
+        return_as_text=True,
+        document_ids=["pets.txt"],
+        page_range=(2, 3),
+    )
+    print(f"Closest {k} text(s) on pets.txt pages 2-3:", filtered_texts)
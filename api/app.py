@@ -1,18 +1,19 @@
 # Import required FastAPI components for building the API
-from fastapi import FastAPI, HTTPException, UploadFile, File, Header
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 # Import Pydantic for data validation and settings management
 from pydantic import BaseModel
-# Import OpenAI client for interacting with OpenAI's API
-from openai import OpenAI
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from bisect import bisect_right
+import math
 import os
-import PyPDF2
-import io
-from typing import Optional, List
-import numpy as np
+import tempfile
+from typing import BinaryIO, Optional, List, TYPE_CHECKING
 import sys
-import asyncio
+import time
 
 # Add parent directory to path for aimakerspace imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,17 +21,60 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-# Import aimakerspace modules
-from aimakerspace.vectordatabase import VectorDatabase
-from aimakerspace.openai_utils.embedding import EmbeddingModel
+# Import aimakerspace modules. Only the stdlib-only admission module is loaded
+# eagerly; PyPDF2, numpy, the openai SDK and the rest of aimakerspace are
+# imported inside the routes that need them, so cold starts and /api/health
+# do not pay for them.
+from aimakerspace.openai_utils.admission import AdmissionRejected, default_limiter
+
+if TYPE_CHECKING:
+    from aimakerspace.vectordatabase import VectorDatabase
+
+# Set WARMUP_ON_STARTUP=1 to preload heavy modules, the shared index and the
+# OpenAI client pool when the server starts instead of on the first request
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "").lower() in ("1", "true", "yes")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_ON_STARTUP:
+        print(f"Warm-up finished: {warm_up()}")
+    yield
+    # Close the OpenAI connection pool shared by all API keys
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
 
 # Initialize FastAPI application with a title
-app = FastAPI(title="OpenAI Chat API")
+app = FastAPI(title="OpenAI Chat API", lifespan=lifespan)
 
 # Global variables for RAG system
 pdf_chunks = []
 pdf_text = ""
 
+# Optional shared index for multi-worker deployments (e.g. uvicorn --workers N).
+# When SHARED_INDEX_DIR is set, the worker handling an upload embeds the chunks
+# once and publishes them there; every worker memory-maps the latest version
+# read-only instead of keeping its own copy of the chunks and vectors.
+SHARED_INDEX_DIR = os.getenv("SHARED_INDEX_DIR")
+
+# Shared limiter for every outbound OpenAI call made by this worker. Bursts
+# beyond OPENAI_MAX_CONCURRENCY wait in a bounded queue (OPENAI_MAX_QUEUE);
+# once that is full, requests fail fast with 429 and a Retry-After header.
+outbound_limiter = default_limiter()
+
+# Uploads are streamed into a spooled temporary file: kept in memory up to
+# UPLOAD_SPOOL_BYTES, then moved to disk. MAX_UPLOAD_MB caps the PDF size and is
+# enforced while the body is still arriving.
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024)
+# Allowance for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+# Near-duplicate chunk removal before embedding (repeated headers, footers,
+# boilerplate pages). DEDUP_THRESHOLD is the estimated Jaccard similarity at
+# which a chunk counts as a duplicate; set it to 0 to disable the stage.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+
 # Configure CORS (Cross-Origin Resource Sharing) middleware
 # This allows the API to be accessed from different domains/origins
 app.add_middleware(
@@ -51,6 +95,85 @@ class ChatRequest(BaseModel):
     user_message: str      # Message from the user
     model: Optional[str] = "gpt-4.1-mini"  # Optional model selection with default
 
+class PDFUploadSpooler:
+    """Multipart callbacks that copy the "file" field into a spooled temp file"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.file = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        self.filename = None
+        self.size = 0
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file_part = False
+    
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+    
+    def on_part_begin(self):
+        self._headers = {}
+    
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+    
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+    
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+    
+    def on_headers_finished(self):
+        from python_multipart.multipart import parse_options_header
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        if options.get(b"name") != b"file" or self.filename is not None:
+            return
+        
+        # Reject non-PDFs before any of their content is read
+        self.filename = options.get(b"filename", b"").decode("utf-8", "replace")
+        if not self.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+        self._in_file_part = True
+    
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_file_part:
+            return
+        self.size += end - start
+        if self.size > self.max_bytes:
+            raise upload_too_large(self.max_bytes)
+        self.file.write(data[start:end])
+    
+    def on_part_end(self):
+        self._in_file_part = False
+
+class LimitedStreamingResponse(StreamingResponse):
+    """Streaming response that returns an outbound limiter slot however it ends"""
+    
+    def __init__(self, content, limiter, **kwargs):
+        super().__init__(content, **kwargs)
+        self.limiter = limiter
+        self._released = False
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Runs even if the body generator was never started, e.g. when the
+            # client disconnects before the headers are sent
+            if not self._released:
+                self._released = True
+                self.limiter.release()
+
 class UploadResponse(BaseModel):
     message: str
     success: bool
@@ -63,23 +186,168 @@ class FlashcardResponse(BaseModel):
     flashcards: List[Flashcard]
     success: bool
 
+# Lazily constructed shared resources
+@lru_cache(maxsize=None)
+def get_shared_index():
+    """Return the shared index for this worker, or None if shared mode is off"""
+    if not SHARED_INDEX_DIR:
+        return None
+    from aimakerspace.shared_index import SharedVectorIndex
+    return SharedVectorIndex(SHARED_INDEX_DIR)
+
+@lru_cache(maxsize=None)
+def get_deduplicator():
+    """Return the near-duplicate filter, or None if deduplication is disabled"""
+    if DEDUP_THRESHOLD <= 0:
+        return None
+    from aimakerspace.deduplication import NearDuplicateFilter
+    return NearDuplicateFilter(threshold=DEDUP_THRESHOLD)
+
+@lru_cache(maxsize=None)
+def get_http_client():
+    """Return the HTTP connection pool shared by every OpenAI client in this worker"""
+    from openai import DefaultAsyncHttpxClient
+    return DefaultAsyncHttpxClient()
+
+def get_openai_client(api_key: str):
+    """Return an async client for the caller's API key on the shared connection pool.
+    
+    Clients are cheap once the pool exists, so they are not cached and API keys
+    are not kept after the request that supplied them.
+    """
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key, http_client=get_http_client())
+
+def warm_up() -> dict:
+    """Preload heavy modules, the shared index and the OpenAI client pool.
+    
+    Returns the time spent on each step in milliseconds.
+    """
+    timings = {}
+    
+    start = time.perf_counter()
+    import numpy, openai, PyPDF2  # noqa: F401
+    import aimakerspace.vectordatabase, aimakerspace.openai_utils.embedding  # noqa: F401
+    get_deduplicator()
+    timings["imports_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    
+    start = time.perf_counter()
+    vector_db = get_shared_vector_db()
+    if vector_db is not None and len(vector_db):
+        # Touch every mapped page so the first query does not fault them in
+        vector_db.vectors.sum()
+    timings["shared_index_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    
+    start = time.perf_counter()
+    get_http_client()
+    timings["client_pool_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    
+    return timings
+
 # Utility functions
-def extract_text_from_pdf(pdf_file: bytes) -> str:
-    """Extract text from PDF file bytes"""
+def rate_limited(error: AdmissionRejected) -> HTTPException:
+    """Build a 429 response telling the client when to retry"""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+    )
+
+def upload_too_large(max_bytes: int) -> HTTPException:
+    """Build a 413 response naming the configured upload cap"""
+    return HTTPException(
+        status_code=413,
+        detail=f"PDF exceeds the maximum upload size of {max_bytes / (1024 * 1024):.3g} MB",
+    )
+
+async def spool_pdf_upload(request: Request) -> PDFUploadSpooler:
+    """Stream the multipart "file" field to a spooled temp file, enforcing the size cap"""
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload with a 'file' field")
+    
+    # Refuse oversized uploads up front when the client declares their size
+    declared_length = request.headers.get("content-length", "")
+    if declared_length.isdigit() and int(declared_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise upload_too_large(MAX_UPLOAD_BYTES)
+    
+    spooler = PDFUploadSpooler(MAX_UPLOAD_BYTES)
+    parser = MultipartParser(params[b"boundary"], spooler.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except HTTPException:
+        spooler.file.close()
+        raise
+    except Exception as e:
+        spooler.file.close()
+        raise HTTPException(status_code=400, detail=f"Invalid multipart upload: {str(e)}")
+    
+    if spooler.filename is None:
+        spooler.file.close()
+        raise HTTPException(status_code=400, detail="No 'file' field found in upload")
+    
+    spooler.file.seek(0)
+    return spooler
+
+def extract_pages_from_pdf(pdf_file: BinaryIO, page_start: Optional[int] = None, page_end: Optional[int] = None) -> list:
+    """Extract (page_number, text) pairs from a PDF file object.
+    
+    Pages are numbered from 1 and ``page_start``/``page_end`` select an
+    inclusive range; pages outside it are never parsed. The PDF is read
+    directly from ``pdf_file`` rather than from an in-memory copy.
+    """
+    import PyPDF2
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        page_count = len(pdf_reader.pages)
+        first = page_start or 1
+        last = min(page_end or page_count, page_count)
+        if first > page_count:
+            raise ValueError(f"page_start {first} is beyond the last page ({page_count})")
+        
+        return [
+            (number, (pdf_reader.pages[number - 1].extract_text() or "") + "\n")
+            for number in range(first, last + 1)
+        ]
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error extracting text from PDF: {str(e)}")
 
+def extract_text_from_pdf(pdf_file: BinaryIO, page_start: Optional[int] = None, page_end: Optional[int] = None) -> str:
+    """Extract text from a PDF file object"""
+    return "".join(text for _, text in extract_pages_from_pdf(pdf_file, page_start, page_end))
+
+def chunk_metadata(document_id: str, pages: list, chunk_size: int, chunk_count: int) -> list:
+    """Return VectorDatabase metadata (page and character offsets) for each chunk"""
+    page_offsets = []
+    offset = 0
+    for _, text in pages:
+        page_offsets.append(offset)
+        offset += len(text)
+    
+    metadata = []
+    for index in range(chunk_count):
+        start = index * chunk_size
+        metadata.append({
+            "document_id": document_id,
+            "page": pages[bisect_right(page_offsets, start) - 1][0],
+            "start": start,
+            "end": min(start + chunk_size, offset),
+        })
+    return metadata
+
+CHUNK_SIZE = 1000
+# Characters of the document sent to the model when generating flashcards
+FLASHCARD_CONTEXT_CHARS = 4000
+
 def build_rag_system(text: str) -> list:
     """Build simple RAG system from PDF text"""
     try:
         # Simple text chunking
-        chunk_size = 1000
+        chunk_size = CHUNK_SIZE
         chunks = []
         
         for i in range(0, len(text), chunk_size):
@@ -90,8 +358,10 @@ def build_rag_system(text: str) -> list:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error building RAG system: {str(e)}")
 
-def find_relevant_chunks_semantic(query: str, chunks: list, k: int = 3) -> list:
+async def find_relevant_chunks_semantic(query: str, chunks: list, k: int = 3) -> list:
     """Semantic search for relevant chunks using VectorDatabase"""
+    from aimakerspace.vectordatabase import VectorDatabase
+    from aimakerspace.openai_utils.embedding import EmbeddingModel
     try:
         # Get embedding model instance
         embedding_model = EmbeddingModel()
@@ -100,18 +370,47 @@ def find_relevant_chunks_semantic(query: str, chunks: list, k: int = 3) -> list:
         vector_db = VectorDatabase(embedding_model)
         
         # Build vector database from chunks (stateless for Vercel)
-        vector_db = asyncio.run(vector_db.abuild_from_list(chunks))
+        vector_db = await vector_db.abuild_from_list(chunks)
         
         # Search for relevant chunks using semantic similarity
-        relevant_chunks = vector_db.search_by_text(query, k=k, return_as_text=True)
+        relevant_chunks = await vector_db.asearch_by_text(query, k=k, return_as_text=True)
         
         return relevant_chunks
         
+    except AdmissionRejected:
+        # Saturation is reported to the client instead of degrading silently
+        raise
     except Exception as e:
         # Fallback to keyword search if embedding fails
         print(f"Semantic search failed, falling back to keyword search: {e}")
         return find_relevant_chunks_keyword(query, chunks, k)
 
+async def find_relevant_chunks_shared(query: str, vector_db: "VectorDatabase", k: int = 3) -> list:
+    """Semantic search over the shared index, with the same keyword fallback"""
+    try:
+        return await vector_db.asearch_by_text(query, k=k, return_as_text=True)
+    except AdmissionRejected:
+        # Saturation is reported to the client instead of degrading silently
+        raise
+    except Exception as e:
+        # Fallback to keyword search if embedding fails
+        print(f"Semantic search failed, falling back to keyword search: {e}")
+        return find_relevant_chunks_keyword(query, vector_db.texts, k)
+
+def get_shared_vector_db() -> Optional["VectorDatabase"]:
+    """Attach to the latest published shared index, if shared mode is enabled"""
+    shared_index = get_shared_index()
+    if shared_index is None:
+        return None
+    return shared_index.attach()
+
+def current_chunks() -> list:
+    """Return the chunks of the current document for this worker"""
+    vector_db = get_shared_vector_db()
+    if vector_db is not None:
+        return vector_db.texts
+    return pdf_chunks
+
 def find_relevant_chunks_keyword(query: str, chunks: list, k: int = 3) -> list:
     """Fallback keyword-based search for relevant chunks"""
     query_words = query.lower().split()
@@ -128,7 +427,12 @@ def find_relevant_chunks_keyword(query: str, chunks: list, k: int = 3) -> list:
 
 # PDF Upload endpoint
 @app.post("/api/upload-pdf", response_model=UploadResponse)
-async def upload_pdf(file: UploadFile = File(...), authorization: str = Header(None)):
+async def upload_pdf(
+    request: Request,
+    authorization: str = Header(None),
+    page_start: Optional[int] = Query(None, ge=1, description="First page to index (1-based)"),
+    page_end: Optional[int] = Query(None, ge=1, description="Last page to index (inclusive)"),
+):
     global pdf_chunks, pdf_text
     
     # Extract API key from Authorization header
@@ -139,27 +443,67 @@ async def upload_pdf(file: UploadFile = File(...), authorization: str = Header(N
     if not api_key:
         raise HTTPException(status_code=400, detail="API key is required")
     
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    if page_start is not None and page_end is not None and page_end < page_start:
+        raise HTTPException(status_code=400, detail="page_end must not be before page_start")
+    
+    # Stream the PDF to a spooled temp file instead of reading it into memory
+    upload = await spool_pdf_upload(request)
     
     try:
-        # Read PDF file
-        pdf_content = await file.read()
-        
-        # Extract text from PDF
-        pdf_text = extract_text_from_pdf(pdf_content)
+        # Extract text from the requested pages, reading straight from the file.
+        # Parsing is CPU-bound and may hit the disk; keep it off the event loop
+        with upload.file:
+            pages = await run_in_threadpool(extract_pages_from_pdf, upload.file, page_start, page_end)
+        pdf_text = "".join(text for _, text in pages)
         
         if not pdf_text.strip():
             raise HTTPException(status_code=400, detail="No text found in PDF")
         
         # Build simple RAG system
         pdf_chunks = build_rag_system(pdf_text)
+        metadata = chunk_metadata(upload.filename, pages, CHUNK_SIZE, len(pdf_chunks))
+        text_length = len(pdf_text)
+        
+        # Drop near-duplicate chunks so they are never embedded or stored
+        dedup_note = ""
+        deduplicator = get_deduplicator()
+        if deduplicator is not None:
+            # CPU-bound; run it off the event loop so other requests keep flowing
+            kept, dedup_report = await run_in_threadpool(deduplicator.filter_indices, pdf_chunks)
+            pdf_chunks = [pdf_chunks[i] for i in kept]
+            metadata = [metadata[i] for i in kept]
+            print(f"Deduplication {dedup_report.summary()}")
+            if dedup_report.removed_chunks:
+                dedup_note = f" Skipped {dedup_report.removed_chunks} near-duplicate chunks."
+        chunk_count = len(pdf_chunks)
+        
+        # In shared mode, embed once and publish the index to all workers
+        shared_index = get_shared_index()
+        if shared_index is not None:
+            from aimakerspace.vectordatabase import VectorDatabase
+            from aimakerspace.openai_utils.embedding import EmbeddingModel
+            vector_db = VectorDatabase(EmbeddingModel())
+            vector_db = await vector_db.abuild_from_list(pdf_chunks, metadata)
+            # Waits for other writers and writes every column; keep it off the
+            # event loop. The document prefix goes along for flashcards.
+            await run_in_threadpool(shared_index.publish, vector_db, pdf_text[:FLASHCARD_CONTEXT_CHARS])
+            # The shared index now owns the document; drop the per-worker copies
+            pdf_chunks = []
+            pdf_text = ""
+        
+        page_note = ""
+        if page_start is not None or page_end is not None:
+            page_note = f" from pages {pages[0][0]}-{pages[-1][0]}"
         
         return UploadResponse(
-            message=f"PDF uploaded successfully! Extracted {len(pdf_text)} characters and created {len(pdf_chunks)} chunks.",
+            message=f"PDF uploaded successfully! Extracted {text_length} characters{page_note} and created {chunk_count} chunks.{dedup_note}",
             success=True
         )
     
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise rate_limited(e)
     except Exception as e:
         print(f"PDF upload error: {str(e)}")
         import traceback
@@ -181,18 +525,23 @@ async def chat(request: ChatRequest, authorization: str = Header(None)):
     
     try:
         # Initialize OpenAI client with the provided API key
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
+        shared_db = get_shared_vector_db()
         
-        # Create an async generator function for streaming responses
-        async def generate():
-            # If we have PDF chunks (PDF uploaded), use RAG
-            if pdf_chunks:
-                # Search for relevant context using semantic search
-                relevant_chunks = find_relevant_chunks_semantic(request.user_message, pdf_chunks, k=3)
-                context = "\n\n".join(relevant_chunks)
-                
-                # Create enhanced system message with context
-                enhanced_system_message = f"""{request.developer_message}
+        # If we have PDF chunks (PDF uploaded), use RAG
+        if pdf_chunks or (shared_db is not None and len(shared_db)):
+            # Search for relevant context using semantic search. Retrieval runs
+            # before the completion slot is taken so one request never holds
+            # two outbound slots at once.
+            if shared_db is not None and len(shared_db):
+                # Shared index is already embedded; only the query is embedded here
+                relevant_chunks = await find_relevant_chunks_shared(request.user_message, shared_db, k=3)
+            else:
+                relevant_chunks = await find_relevant_chunks_semantic(request.user_message, pdf_chunks, k=3)
+            context = "\n\n".join(relevant_chunks)
+            
+            # Create enhanced system message with context
+            enhanced_system_message = f"""{request.developer_message}
 
 IMPORTANT: You must ONLY answer questions using information from the provided context below. If the answer is not in the context, say "I don't have enough information in the provided document to answer that question."
 
@@ -204,33 +553,42 @@ If there is no topic change, do not output a CONTROL line.
 
 Context from uploaded document:
 {context}"""
-                
-                messages = [
-                    {"role": "system", "content": enhanced_system_message},
-                    {"role": "user", "content": request.user_message}
-                ]
-            else:
-                # No PDF uploaded, use original behavior
-                messages = [
-                    {"role": "system", "content": request.developer_message},
-                    {"role": "user", "content": request.user_message}
-                ]
             
+            messages = [
+                {"role": "system", "content": enhanced_system_message},
+                {"role": "user", "content": request.user_message}
+            ]
+        else:
+            # No PDF uploaded, use original behavior
+            messages = [
+                {"role": "system", "content": request.developer_message},
+                {"role": "user", "content": request.user_message}
+            ]
+        
+        # Reserve an outbound slot now so saturation is reported as a 429
+        # before the streaming response has started
+        await outbound_limiter.aacquire()
+        
+        # Create an async generator function for streaming responses
+        async def generate():
             # Create a streaming chat completion request
-            stream = client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model=request.model,
                 messages=messages,
                 stream=True  # Enable streaming response
             )
             
             # Yield each chunk of the response as it becomes available
-            for chunk in stream:
+            async for chunk in stream:
                 if chunk.choices[0].delta.content is not None:
                     yield chunk.choices[0].delta.content
 
-        # Return a streaming response to the client
-        return StreamingResponse(generate(), media_type="text/plain")
+        # Return a streaming response to the client; it holds the slot until
+        # the stream has been sent, the client disconnects or sending fails
+        return LimitedStreamingResponse(generate(), outbound_limiter, media_type="text/plain")
     
+    except AdmissionRejected as e:
+        raise rate_limited(e)
     except Exception as e:
         # Handle any errors that occur during processing
         raise HTTPException(status_code=500, detail=str(e))
@@ -240,6 +598,12 @@ Context from uploaded document:
 async def health_check():
     return {"status": "ok"}
 
+# Warm-up endpoint, e.g. for a scheduled ping that keeps an instance hot
+# A plain def so FastAPI runs the imports and page faults in its threadpool
+@app.get("/api/warmup")
+def warmup():
+    return {"status": "ok", "timings": warm_up()}
+
 # Flashcard generation endpoint
 @app.post("/api/flashcards", response_model=FlashcardResponse)
 async def generate_flashcards(authorization: str = Header(None)):
@@ -253,18 +617,26 @@ async def generate_flashcards(authorization: str = Header(None)):
     if not api_key:
         raise HTTPException(status_code=400, detail="API key is required")
     
-    if not pdf_text or not pdf_text.strip():
+    # Chunks may have been deduplicated, so the shared index publishes the
+    # document prefix separately rather than rebuilding it from chunks
+    chunks = current_chunks()
+    document_text = pdf_text
+    shared_index = get_shared_index()
+    if not document_text and shared_index is not None:
+        document_text = shared_index.excerpt()
+    
+    if not document_text or not document_text.strip():
         raise HTTPException(status_code=400, detail="No PDF has been uploaded yet. Please upload a PDF first.")
     
     try:
         # Initialize OpenAI client
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         
         # Create a prompt for flashcard generation
         flashcard_prompt = f"""Based on the following document content, generate 8-10 educational flashcards in Q&A format. Each flashcard should have a clear, specific question and a comprehensive answer.
 
 Document content:
-{pdf_text[:4000]}  # Limit to first 4000 characters to avoid token limits
+{document_text[:4000]}  # Limit to first 4000 characters to avoid token limits
 
 Generate flashcards that:
 1. Cover the main topics and concepts from the document
@@ -281,15 +653,16 @@ Return the flashcards in this exact JSON format:
 Only return the JSON array, no other text."""
 
         # Generate flashcards using OpenAI
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
-                {"role": "system", "content": "You are an educational assistant that creates high-quality flashcards from document content. Always respond with valid JSON only."},
-                {"role": "user", "content": flashcard_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
+        async with outbound_limiter.alimit():
+            response = await client.chat.completions.create(
+                model="gpt-4.1-mini",
+                messages=[
+                    {"role": "system", "content": "You are an educational assistant that creates high-quality flashcards from document content. Always respond with valid JSON only."},
+                    {"role": "user", "content": flashcard_prompt}
+                ],
+                temperature=0.7,
+                max_tokens=2000
+            )
         
         # Parse the response
         flashcard_text = response.choices[0].message.content.strip()
@@ -325,7 +698,7 @@ Only return the JSON array, no other text."""
         except (json.JSONDecodeError, ValueError) as e:
             # Fallback: create simple flashcards from document chunks
             flashcards = []
-            for i, chunk in enumerate(pdf_chunks[:8]):
+            for i, chunk in enumerate(chunks[:8]):
                 if len(chunk.strip()) > 50:  # Only use substantial chunks
                     flashcards.append(Flashcard(
                         question=f"What is mentioned about: {chunk[:100]}...?",
@@ -337,6 +710,8 @@ Only return the JSON array, no other text."""
                 success=True
             )
     
+    except AdmissionRejected as e:
+        raise rate_limited(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating flashcards: {str(e)}")
 
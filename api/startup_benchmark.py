@@ -0,0 +1,164 @@
+# Cold-start benchmark for the FastAPI backend
+#
+# Usage (from the api directory):
+#   python startup_benchmark.py imports             # import-time profile of app.py
+#   python startup_benchmark.py endpoints           # cold-start time to first byte
+#   python startup_benchmark.py endpoints --runs 5 --endpoint GET:/api/warmup
+#
+# "endpoints" starts a fresh uvicorn process for every measurement and times
+# from process launch until the first byte of the response to a single
+# request, which is what a serverless cold start costs the caller.
+import argparse
+import http.client
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def sample_pdf() -> bytes:
+    """Build a one-page PDF whose only text is "Cold start benchmark"."""
+    content = b"BT /F1 12 Tf 72 720 Td (Cold start benchmark) Tj ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_offset,
+    )
+    return pdf
+
+
+DEFAULT_ENDPOINTS = ["GET:/api/health", "POST:/api/upload-pdf", "POST:/api/flashcards"]
+
+
+def profile_imports(top: int) -> None:
+    """Print the slowest modules imported by app.py, by cumulative time"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+
+    total_us = sum(cumulative for cumulative, _, depth, _ in rows if depth == 0)
+    print(f"Total import time: {total_us / 1000:.1f} ms\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, depth, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{module}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_request(method: str, path: str):
+    """Return the body and headers used to call an endpoint"""
+    headers = {"Authorization": "Bearer benchmark"}
+    if path == "/api/upload-pdf":
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="benchmark.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode() + sample_pdf() + f"\r\n--{boundary}--\r\n".encode()
+        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+        return body, headers
+    if method == "POST":
+        headers["Content-Type"] = "application/json"
+        return b"{}", headers
+    return None, headers
+
+
+def time_to_first_byte(method: str, path: str, timeout: float) -> float:
+    """Start a fresh server and time launch-to-first-byte for one request"""
+    port = free_port()
+    body, headers = build_request(method, path)
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read(1)
+                return time.perf_counter() - started
+            except (ConnectionRefusedError, http.client.RemoteDisconnected):
+                time.sleep(0.005)
+            finally:
+                connection.close()
+        raise TimeoutError(f"{method} {path} did not respond within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def benchmark_endpoints(endpoints: list, runs: int, timeout: float) -> None:
+    """Print cold-start time to first byte for each endpoint"""
+    print(f"{'endpoint':<28} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for endpoint in endpoints:
+        method, path = endpoint.split(":", 1)
+        samples = [time_to_first_byte(method.upper(), path, timeout) * 1000 for _ in range(runs)]
+        print(
+            f"{method.upper() + ' ' + path:<28} {statistics.median(samples):>10.1f} "
+            f"{min(samples):>8.1f} {max(samples):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the FastAPI backend")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    imports_parser = subcommands.add_parser("imports", help="import-time profile of app.py")
+    imports_parser.add_argument("--top", type=int, default=25)
+
+    endpoints_parser = subcommands.add_parser("endpoints", help="cold-start time to first byte")
+    endpoints_parser.add_argument(
+        "--endpoint",
+        action="append",
+        help="METHOD:PATH to measure (repeatable); defaults to health, upload and flashcards",
+    )
+    endpoints_parser.add_argument("--runs", type=int, default=3)
+    endpoints_parser.add_argument("--timeout", type=float, default=30.0)
+
+    args = parser.parse_args()
+    if args.command == "imports":
+        profile_imports(args.top)
+    else:
+        benchmark_endpoints(args.endpoint or DEFAULT_ENDPOINTS, args.runs, args.timeout)
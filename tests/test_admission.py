@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aimakerspace.openai_utils.admission import (
+    AdmissionRejected,
+    ConcurrencyLimiter,
+    SingleFlight,
+)
+
+
+def test_limiter_rejects_when_queue_is_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1, queue_timeout=1.0)
+        await limiter.aacquire()
+        queued = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await limiter.aacquire()
+
+        limiter.release()
+        await queued
+        limiter.release()
+        return limiter.active, limiter.queued
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_limiter_never_exceeds_max_concurrency():
+    limiter = ConcurrencyLimiter(max_concurrency=2, max_queue=10)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with limiter.limit():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert limiter.active == 0
+
+
+def test_limiter_times_out_queued_callers():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout=0.05)
+        await limiter.aacquire()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.aacquire()
+
+        assert rejected.value.retry_after == limiter.retry_after
+        assert limiter.queued == 0
+        limiter.release()
+        return limiter.active
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout=1.0)
+        await limiter.aacquire()
+        waiter = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.queued == 0
+        limiter.release()
+        return limiter.active
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_singleflight_coalesces_identical_calls():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "embedding"
+
+    async def scenario():
+        singleflight = SingleFlight()
+        return await asyncio.gather(*(singleflight.ado("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["embedding"] * 5
+    assert calls == 1
+
+
+def test_singleflight_shares_upstream_errors():
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def scenario():
+        singleflight = SingleFlight()
+        return await asyncio.gather(
+            singleflight.ado("key", fetch),
+            singleflight.ado("key", fetch),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "embedding"
+
+    async def scenario():
+        singleflight = SingleFlight()
+        first = asyncio.create_task(singleflight.ado("key", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(singleflight.ado("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "embedding"
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "api"))
+
+import app  # noqa: E402
+from aimakerspace.openai_utils.admission import AdmissionRejected  # noqa: E402
+from aimakerspace.vectordatabase import VectorDatabase  # noqa: E402
+
+
+class FailingEmbeddingModel:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def async_get_embedding(self, text):
+        raise self.error
+
+
+def shared_database(error: Exception) -> VectorDatabase:
+    database = VectorDatabase(FailingEmbeddingModel(error))
+    database.insert("the cat sat on the mat", [1.0, 0.0])
+    database.insert("stock prices rose sharply", [0.0, 1.0])
+    return database
+
+
+def test_shared_search_falls_back_to_keywords_when_embedding_fails():
+    database = shared_database(ValueError("OPENAI_API_KEY is not set"))
+
+    chunks = asyncio.run(app.find_relevant_chunks_shared("stock prices", database, k=1))
+
+    assert chunks == ["stock prices rose sharply"]
+
+
+def test_shared_search_propagates_admission_rejection():
+    database = shared_database(AdmissionRejected(1.0))
+
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(app.find_relevant_chunks_shared("stock prices", database, k=1))
+
+
+def test_chat_releases_limiter_slot_when_send_fails(monkeypatch):
+    from aimakerspace.openai_utils.admission import ConcurrencyLimiter
+
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(app, "outbound_limiter", limiter)
+    monkeypatch.setattr(app, "pdf_chunks", [])
+    monkeypatch.setattr(app, "get_shared_vector_db", lambda: None)
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        # The client disconnected before the response headers went out
+        raise OSError("client disconnected")
+
+    async def scenario():
+        request = app.ChatRequest(developer_message="Be brief.", user_message="Hi")
+        response = await app.chat(request, authorization="Bearer test-key")
+        assert limiter.active == 1
+
+        with pytest.raises(OSError):
+            await response({"type": "http"}, receive, send)
+
+    asyncio.run(scenario())
+    assert limiter.active == 0
+
+
+class RecordingCompletions:
+    def __init__(self):
+        self.prompts = []
+
+    async def create(self, messages, **kwargs):
+        from types import SimpleNamespace
+
+        self.prompts.append(messages[-1]["content"])
+        message = SimpleNamespace(content="not json")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_flashcards_use_published_prefix_not_deduplicated_chunks(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    from aimakerspace.shared_index import SharedVectorIndex
+
+    shared_index = SharedVectorIndex(str(tmp_path))
+    database = VectorDatabase(FailingEmbeddingModel(ValueError()))
+    database.insert("first chunk", [1.0, 0.0])
+    database.insert("third chunk", [0.0, 1.0])
+    shared_index.publish(database, excerpt="first chunk second chunk third chunk")
+
+    completions = RecordingCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(app, "pdf_text", "")
+    monkeypatch.setattr(app, "pdf_chunks", [])
+    monkeypatch.setattr(app, "get_shared_index", lambda: shared_index)
+    monkeypatch.setattr(app, "get_openai_client", lambda api_key: client)
+
+    asyncio.run(app.generate_flashcards(authorization="Bearer test-key"))
+
+    assert "first chunk second chunk third chunk" in completions.prompts[0]
+
+
+def test_warmup_route_runs_off_the_event_loop(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    loops = []
+
+    def warm_up():
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return {}
+
+    monkeypatch.setattr(app, "warm_up", warm_up)
+
+    with TestClient(app.app) as client:
+        response = client.get("/api/warmup")
+
+    assert response.status_code == 200
+    assert loops == [None]
+
+
+def test_openai_clients_share_one_connection_pool():
+    first = app.get_openai_client("key-one")
+    second = app.get_openai_client("key-two")
+
+    assert first.api_key == "key-one" and second.api_key == "key-two"
+    assert first._client is second._client is app.get_http_client()
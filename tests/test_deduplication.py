@@ -0,0 +1,33 @@
+from aimakerspace.deduplication import NearDuplicateFilter
+
+FOOTER = (
+    "Confidential - Annual Report 2023. This document is intended solely for "
+    "shareholders of Example Corp and may not be reproduced or distributed "
+    "without prior written consent. Page {page} of 48."
+)
+
+
+def test_near_duplicate_is_dropped_and_first_copy_kept():
+    chunks = [
+        FOOTER.format(page=1),
+        "Revenue grew by 12% driven by cloud services and new enterprise contracts.",
+        FOOTER.format(page=2),
+    ]
+
+    kept, report = NearDuplicateFilter(threshold=0.8).filter_indices(chunks)
+
+    assert kept == [0, 1]
+    assert report.duplicate_of == {2: 0}
+    assert report.removed_chunks == 1
+
+
+def test_distinct_chunks_are_kept():
+    chunks = [
+        "Operating expenses were flat compared with the previous fiscal year.",
+        "Headcount increased to 1,200 employees across four offices.",
+    ]
+
+    kept, report = NearDuplicateFilter().filter_indices(chunks)
+
+    assert kept == [0, 1]
+    assert report.removed_chunks == 0
@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+import pytest
+
+from aimakerspace.shared_index import MappedTexts, SharedVectorIndex
+from aimakerspace.vectordatabase import VectorDatabase
+
+
+class StubEmbeddingModel:
+    pass
+
+
+def build_database(*texts: str) -> VectorDatabase:
+    database = VectorDatabase(StubEmbeddingModel())
+    for index, text in enumerate(texts):
+        database.insert(
+            text,
+            [1.0, float(index)],
+            document_id=f"d{index % 2}",
+            page=index + 1,
+            start=index * 10,
+            end=index * 10 + len(text),
+        )
+    return database
+
+
+def test_attach_round_trips_columns_filters_and_metadata(tmp_path):
+    index = SharedVectorIndex(str(tmp_path))
+    assert index.attach() is None
+
+    original = build_database("alpha", "beta", "gamma")
+    assert index.publish(original) == 1
+    attached = index.attach(StubEmbeddingModel())
+
+    assert len(attached) == 3
+    assert list(attached.texts) == ["alpha", "beta", "gamma"]
+    assert attached.get_metadata(2) == original.get_metadata(2)
+    np.testing.assert_allclose(attached.vectors, original.vectors)
+
+    query = np.array([1.0, 0.0])
+    assert attached.search_ids(query, k=3, document_ids=["d0"]) == original.search_ids(
+        query, k=3, document_ids=["d0"]
+    )
+    results = attached.search_ids(query, k=3, page_range=(2, 3))
+    assert sorted(chunk_id for chunk_id, _ in results) == [1, 2]
+
+
+def test_second_reader_switches_to_new_generation(tmp_path):
+    writer = SharedVectorIndex(str(tmp_path))
+    reader = SharedVectorIndex(str(tmp_path))
+
+    writer.publish(build_database("first"))
+    assert list(reader.attach().texts) == ["first"]
+    assert reader.attach() is reader.attach()
+
+    writer.publish(build_database("second", "third"))
+    assert reader.generation() == 2
+    assert list(reader.attach().texts) == ["second", "third"]
+
+
+def test_attached_database_rejects_inserts(tmp_path):
+    index = SharedVectorIndex(str(tmp_path))
+    index.publish(build_database("alpha"))
+
+    with pytest.raises(RuntimeError):
+        index.attach().insert("beta", [0.0, 1.0])
+
+
+def test_publish_skips_generation_left_by_crashed_writer(tmp_path):
+    index = SharedVectorIndex(str(tmp_path))
+    index.publish(build_database("first"))
+    # A writer moved generation 2 into place but died before updating CURRENT
+    os.mkdir(tmp_path / "gen-00000002")
+
+    assert index.publish(build_database("second")) == 3
+    assert list(index.attach().texts) == ["second"]
+
+
+def test_publish_prunes_old_generations(tmp_path):
+    index = SharedVectorIndex(str(tmp_path), keep_generations=1)
+    index.publish(build_database("first"))
+    index.publish(build_database("second"))
+
+    assert sorted(entry.name for entry in tmp_path.glob("gen-*")) == ["gen-00000002"]
+
+
+def test_mapped_texts_decode_non_ascii(tmp_path):
+    texts = ["naïve café", "日本語のテキスト", "", "emoji 🚀"]
+    index = SharedVectorIndex(str(tmp_path))
+    index.publish(build_database(*texts))
+
+    mapped = index.attach().texts
+    assert isinstance(mapped, MappedTexts)
+    assert list(mapped) == texts
+    assert mapped[-1] == "emoji 🚀"
+    assert mapped[1:3] == ["日本語のテキスト", ""]
+    with pytest.raises(IndexError):
+        mapped[len(texts)]
+
+
+def test_excerpt_is_published_with_each_generation(tmp_path):
+    index = SharedVectorIndex(str(tmp_path))
+    assert index.excerpt() == ""
+
+    index.publish(build_database("alpha"), excerpt="Chapter 1 — Überblick")
+    assert index.excerpt() == "Chapter 1 — Überblick"
+
+    index.publish(build_database("beta"))
+    assert index.excerpt() == ""
@@ -0,0 +1,151 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "api"))
+
+import app  # noqa: E402
+
+AUTHORIZATION = {"Authorization": "Bearer test-key"}
+
+
+def build_pdf(*page_texts: str) -> bytes:
+    """Build a PDF with one page per text, each drawn in Helvetica."""
+    page_count = len(page_texts)
+    font = 3 + 2 * page_count
+    kids = " ".join(f"{3 + 2 * index} 0 R" for index in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode(),
+    ]
+    for index, text in enumerate(page_texts):
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * index} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_offset,
+    )
+    return pdf
+
+
+def multipart(field: str, filename: str, data: bytes, boundary: str = "test-boundary"):
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    headers = {**AUTHORIZATION, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    return body, headers
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, "pdf_chunks", [])
+    monkeypatch.setattr(app, "pdf_text", "")
+    monkeypatch.setattr(app, "get_shared_index", lambda: None)
+    return TestClient(app.app)
+
+
+def test_upload_extracts_text_and_builds_chunks(client):
+    body, headers = multipart("file", "notes.pdf", build_pdf("Photosynthesis converts light"))
+
+    response = client.post("/api/upload-pdf", content=body, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+    assert "Photosynthesis converts light" in app.pdf_text
+    assert len(app.pdf_chunks) == 1
+
+
+def test_upload_rejects_non_pdf_filename(client):
+    body, headers = multipart("file", "notes.txt", b"plain text")
+
+    response = client.post("/api/upload-pdf", content=body, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Only PDF files are allowed"
+
+
+def test_upload_requires_file_field(client):
+    body, headers = multipart("document", "notes.pdf", build_pdf("Ignored"))
+
+    response = client.post("/api/upload-pdf", content=body, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No 'file' field found in upload"
+
+
+def test_upload_rejects_declared_length_over_cap(client, monkeypatch):
+    monkeypatch.setattr(app, "MAX_UPLOAD_BYTES", 1024)
+    data = b"%PDF-1.4\n" + b"0" * (app.MULTIPART_OVERHEAD_BYTES + 2048)
+    body, headers = multipart("file", "large.pdf", data)
+
+    response = client.post("/api/upload-pdf", content=body, headers=headers)
+
+    assert response.status_code == 413
+
+
+def test_upload_rejects_chunked_body_over_cap_mid_stream(client, monkeypatch):
+    monkeypatch.setattr(app, "MAX_UPLOAD_BYTES", 1024)
+    body, headers = multipart("file", "large.pdf", b"%PDF-1.4\n" + b"0" * 4096)
+
+    def chunks():
+        # A generator body is sent chunked, without a Content-Length header
+        for start in range(0, len(body), 512):
+            yield body[start : start + 512]
+
+    response = client.post("/api/upload-pdf", content=chunks(), headers=headers)
+
+    assert response.status_code == 413
+
+
+def test_upload_rejects_page_start_past_last_page(client):
+    body, headers = multipart("file", "notes.pdf", build_pdf("One", "Two"))
+
+    response = client.post("/api/upload-pdf?page_start=3", content=body, headers=headers)
+
+    assert response.status_code == 400
+    assert "beyond the last page (2)" in response.json()["detail"]
+
+
+def test_upload_indexes_only_requested_page_range(client):
+    body, headers = multipart("file", "notes.pdf", build_pdf("Alpha", "Bravo", "Charlie"))
+
+    response = client.post(
+        "/api/upload-pdf?page_start=2&page_end=3", content=body, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert "from pages 2-3" in response.json()["message"]
+    assert "Alpha" not in app.pdf_text
+    assert "Bravo" in app.pdf_text and "Charlie" in app.pdf_text
+
+
+def test_chunk_metadata_maps_offsets_to_pages():
+    pages = [(3, "a" * 1500), (4, "b" * 700), (5, "c" * 900)]
+
+    metadata = app.chunk_metadata("notes.pdf", pages, chunk_size=1000, chunk_count=4)
+
+    assert [(item["page"], item["start"], item["end"]) for item in metadata] == [
+        (3, 0, 1000),
+        (3, 1000, 2000),
+        (4, 2000, 3000),
+        (5, 3000, 3100),
+    ]
+    assert {item["document_id"] for item in metadata} == {"notes.pdf"}
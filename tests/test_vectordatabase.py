@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from aimakerspace.vectordatabase import VectorDatabase
+
+
+class StubEmbeddingModel:
+    pass
+
+
+def build_database() -> VectorDatabase:
+    database = VectorDatabase(StubEmbeddingModel())
+    database.insert("alpha", [1.0, 0.0], document_id="d1", page=1)
+    database.insert("alpha", [0.9, 0.1], document_id="d2", page=2)
+    database.insert("beta", [0.0, 1.0], document_id="d1", page=3)
+    return database
+
+
+def test_identical_texts_are_stored_separately():
+    database = build_database()
+
+    assert len(database) == 3
+    assert database.get_metadata(1)["document_id"] == "d2"
+
+
+def test_search_applies_document_and_page_filters():
+    database = build_database()
+
+    results = database.search_ids(np.array([1.0, 0.0]), k=3, document_ids=["d1"])
+    assert [chunk_id for chunk_id, _ in results] == [0, 2]
+
+    results = database.search_ids(np.array([1.0, 0.0]), k=3, page_range=(2, 3))
+    assert [chunk_id for chunk_id, _ in results] == [1, 2]
+
+
+def test_search_rejects_bare_string_document_ids():
+    database = build_database()
+
+    with pytest.raises(TypeError):
+        database.search(np.array([1.0, 0.0]), k=1, document_ids="d1")
+
+
+def test_embedding_model_can_be_replaced():
+    database = build_database()
+    model = StubEmbeddingModel()
+
+    database.embedding_model = model
+
+    assert database.embedding_model is model